@@ -1,8 +1,33 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, case, desc, select, insert, update, literal, union_all, text
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import IntegrityError
-from app.database import CVSession, User
-from typing import Optional, Dict, Any, List
+from app.database import CVSession, User, LLMCache, SQL_DEBUG, job_title_fts_ready
+from typing import Optional, Dict, Any, Iterator, List
+from datetime import datetime, timedelta
 import json
+import os
+import threading
+import time
+
+# Process-local cache for get_comprehensive_stats, cleared on every session write
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "30"))
+_stats_cache: Dict[str, Any] = {}
+_stats_cache_lock = threading.Lock()
+
+def _invalidate_stats_cache() -> None:
+    """Drop cached statistics after sessions are created, updated or deleted."""
+    with _stats_cache_lock:
+        _stats_cache.clear()
+
+# Columns needed to render a session in a list view (no CV text or JSON blobs)
+SESSION_SUMMARY_COLUMNS = (
+    CVSession.id,
+    CVSession.job_title,
+    CVSession.original_score,
+    CVSession.new_score,
+    CVSession.cv_file_type,
+    CVSession.created_at
+)
 
 class CVSessionCRUD:
     """CRUD operations for CV sessions."""
@@ -18,9 +43,25 @@ class CVSessionCRUD:
         )
         db.add(db_session)
         db.commit()
+        _invalidate_stats_cache()
         db.refresh(db_session)
         return db_session
     
+    @staticmethod
+    def create_sessions_bulk(db: Session, rows: List[Dict[str, Any]]) -> int:
+        """Insert many CV sessions at once (for imports and migrations).
+        
+        Each row is a dict of CVSession column values. Rows are sent as batched
+        multi-row INSERTs rather than one statement per session; the analyze
+        endpoint keeps using create_session for its single session.
+        """
+        if not rows:
+            return 0
+        db.execute(insert(CVSession), rows)
+        db.commit()
+        _invalidate_stats_cache()
+        return len(rows)
+    
     @staticmethod
     def get_session(db: Session, session_id: str) -> Optional[CVSession]:
         """Get a CV session by ID."""
@@ -40,19 +81,17 @@ class CVSessionCRUD:
         summary: str
     ) -> Optional[CVSession]:
         """Update session with analysis results."""
-        session = db.query(CVSession).filter(CVSession.id == session_id).first()
-        if session:
-            session.job_title = job_title
-            session.job_description = job_description
-            session.original_score = original_score
-            session.missing_skills = missing_skills
-            session.strengths = strengths
-            session.experience_gaps = experience_gaps
-            session.recommendations = recommendations
-            session.summary = summary
-            db.commit()
-            db.refresh(session)
-        return session
+        stmt = update(CVSession).where(CVSession.id == session_id).values(
+            job_title=job_title,
+            job_description=job_description,
+            original_score=original_score,
+            missing_skills=missing_skills,
+            strengths=strengths,
+            experience_gaps=experience_gaps,
+            recommendations=recommendations,
+            summary=summary
+        ).returning(CVSession)
+        return CVSessionCRUD._execute_update(db, stmt)
     
     @staticmethod
     def update_enhancement(
@@ -64,20 +103,60 @@ class CVSessionCRUD:
         enhanced_cv_path: str
     ) -> Optional[CVSession]:
         """Update session with enhancement results."""
-        session = db.query(CVSession).filter(CVSession.id == session_id).first()
+        stmt = update(CVSession).where(CVSession.id == session_id).values(
+            additional_info=additional_info,
+            new_score=new_score,
+            improvement_suggestions=improvement_suggestions,
+            enhanced_cv_path=enhanced_cv_path
+        ).returning(CVSession)
+        return CVSessionCRUD._execute_update(db, stmt)
+    
+    @staticmethod
+    def _execute_update(db: Session, stmt) -> Optional[CVSession]:
+        """Run a single-session UPDATE ... RETURNING and commit.
+        
+        The updated row comes back with the UPDATE itself, so no SELECT is issued
+        before or after it (attributes are only reloaded if read after the commit).
+        """
+        session = db.scalars(
+            stmt,
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        ).one_or_none()
+        db.commit()
         if session:
-            session.additional_info = additional_info
-            session.new_score = new_score
-            session.improvement_suggestions = improvement_suggestions
-            session.enhanced_cv_path = enhanced_cv_path
-            db.commit()
-            db.refresh(session)
+            _invalidate_stats_cache()
         return session
     
     @staticmethod
-    def get_all_sessions(db: Session, limit: int = 100) -> List[CVSession]:
-        """Get all CV sessions (for admin purposes)."""
-        return db.query(CVSession).order_by(CVSession.created_at.desc()).limit(limit).all()
+    def get_all_sessions(db: Session, limit: int = 100, load_columns: List[Any] = None) -> List[CVSession]:
+        """Get all CV sessions (for admin purposes).
+        
+        ``load_columns`` restricts which columns are loaded on the returned objects;
+        with DEBUG=true, touching any other column raises instead of lazy loading.
+        """
+        query = db.query(CVSession)
+        if load_columns:
+            query = query.options(load_only(*load_columns, raiseload=SQL_DEBUG))
+        return query.order_by(CVSession.created_at.desc()).limit(limit).all()
+    
+    @staticmethod
+    def get_all_sessions_streaming(
+        db: Session,
+        columns: List[Any] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        batch_size: int = 500
+    ) -> Iterator[Any]:
+        """Iterate over CV sessions newest first, fetching ``batch_size`` rows at a time.
+        
+        Rows are streamed from the database cursor instead of being loaded into a list.
+        Pass ``columns`` to select plain rows rather than CVSession objects.
+        """
+        query = db.query(*columns) if columns else db.query(CVSession)
+        query = query.order_by(CVSession.created_at.desc()).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execution_options(stream_results=True).yield_per(batch_size)
     
     @staticmethod
     def get_filtered_sessions(
@@ -87,14 +166,26 @@ class CVSessionCRUD:
         job_title: str = None,
         min_score: int = None,
         max_score: int = None,
-        file_type: str = None
-    ) -> List[CVSession]:
-        """Get filtered CV sessions with pagination."""
-        query = db.query(CVSession)
+        file_type: str = None,
+        columns: List[Any] = None,
+        summary_only: bool = True
+    ) -> List[Any]:
+        """Get filtered CV sessions with pagination.
+        
+        By default only SESSION_SUMMARY_COLUMNS are selected and rows are returned.
+        Pass ``columns`` to choose the fields, or ``summary_only=False`` to load
+        full CVSession objects.
+        """
+        if columns:
+            query = db.query(*columns)
+        elif summary_only:
+            query = db.query(*SESSION_SUMMARY_COLUMNS)
+        else:
+            query = db.query(CVSession)
         
         # Apply filters
         if job_title:
-            query = query.filter(CVSession.job_title.ilike(f"%{job_title}%"))
+            query = query.filter(CVSessionCRUD._job_title_contains(job_title))
         if min_score is not None:
             query = query.filter(CVSession.original_score >= min_score)
         if max_score is not None:
@@ -104,79 +195,99 @@ class CVSessionCRUD:
         
         return query.order_by(CVSession.created_at.desc()).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def _job_title_contains(job_title: str):
+        """Case-insensitive substring filter on job_title, using the trigram index when available."""
+        # Trigram matching needs at least three characters
+        if job_title_fts_ready() and len(job_title) >= 3:
+            phrase = '"' + job_title.replace('"', '""') + '"'
+            return text(
+                "cv_sessions.rowid IN (SELECT rowid FROM cv_sessions_fts WHERE cv_sessions_fts MATCH :job_title_phrase)"
+            ).bindparams(job_title_phrase=phrase)
+        return CVSession.job_title.ilike(f"%{job_title}%")
+    
     @staticmethod
     def get_sessions_count(db: Session) -> int:
         """Get total count of CV sessions."""
-        return db.query(CVSession).count()
+        return db.query(func.count(CVSession.id)).scalar()
     
     @staticmethod
     def get_comprehensive_stats(db: Session) -> Dict[str, Any]:
-        """Get comprehensive statistics about CV sessions."""
-        from sqlalchemy import func, text
-        from datetime import datetime, timedelta
+        """Get comprehensive statistics about CV sessions (cached for STATS_CACHE_TTL seconds)."""
+        with _stats_cache_lock:
+            cached = _stats_cache.get("stats")
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
         
-        # Basic counts
-        total_sessions = db.query(CVSession).count()
-        analyzed_sessions = db.query(CVSession).filter(CVSession.original_score.isnot(None)).count()
-        enhanced_sessions = db.query(CVSession).filter(CVSession.enhanced_cv_path.isnot(None)).count()
+        seven_days_ago = datetime.utcnow() - timedelta(days=7)
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         
-        # Score statistics
-        score_stats = db.query(
+        def count_where(condition):
+            return func.sum(case((condition, 1), else_=0))
+        
+        is_analyzed = CVSession.original_score.isnot(None)
+        improvement = CVSession.new_score - CVSession.original_score
+        
+        # All scalar metrics in a single pass over the table
+        stats = db.query(
+            func.count().label('total_sessions'),
+            count_where(is_analyzed).label('analyzed_sessions'),
+            count_where(CVSession.enhanced_cv_path.isnot(None)).label('enhanced_sessions'),
             func.avg(CVSession.original_score).label('avg_original'),
-            func.avg(CVSession.new_score).label('avg_enhanced'),
+            func.avg(case((is_analyzed, CVSession.new_score))).label('avg_enhanced'),
             func.max(CVSession.original_score).label('max_original'),
             func.min(CVSession.original_score).label('min_original'),
-            func.max(CVSession.new_score - CVSession.original_score).label('max_improvement')
-        ).filter(CVSession.original_score.isnot(None)).first()
-        
-        # File type distribution
-        file_type_stats = db.query(
-            CVSession.cv_file_type,
-            func.count(CVSession.cv_file_type).label('count')
-        ).group_by(CVSession.cv_file_type).all()
+            func.max(improvement).label('max_improvement'),
+            count_where(CVSession.created_at >= seven_days_ago).label('jobs_last_7_days'),
+            count_where(CVSession.created_at >= thirty_days_ago).label('jobs_last_30_days'),
+            count_where(CVSession.original_score >= 80).label('high_performing_jobs'),
+            count_where(CVSession.original_score < 50).label('low_performing_jobs'),
+            count_where(improvement >= 20).label('most_improved_jobs')
+        ).one()
         
-        file_type_distribution = {stat.cv_file_type: stat.count for stat in file_type_stats}
+        # File type distribution and top job titles in a second round-trip
+        file_type_stats = select(
+            literal('file_type').label('kind'),
+            CVSession.cv_file_type.label('value'),
+            func.count().label('count')
+        ).group_by(CVSession.cv_file_type)
         
-        # Top job titles
-        job_title_stats = db.query(
-            CVSession.job_title,
-            func.count(CVSession.job_title).label('count')
-        ).filter(CVSession.job_title.isnot(None)).group_by(CVSession.job_title).order_by(func.count(CVSession.job_title).desc()).limit(10).all()
+        job_title_stats = select(
+            literal('job_title').label('kind'),
+            CVSession.job_title.label('value'),
+            func.count().label('count')
+        ).filter(CVSession.job_title.isnot(None)).group_by(CVSession.job_title).order_by(desc('count')).limit(10).subquery()
         
-        top_job_titles = [{"title": stat.job_title, "count": stat.count} for stat in job_title_stats]
+        grouped_rows = db.execute(union_all(file_type_stats, select(job_title_stats))).all()
         
-        # Recent activity
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        file_type_distribution = {row.value: row.count for row in grouped_rows if row.kind == 'file_type'}
+        top_job_titles = [
+            {"title": row.value, "count": row.count}
+            for row in sorted((row for row in grouped_rows if row.kind == 'job_title'), key=lambda row: row.count, reverse=True)
+        ]
         
-        jobs_last_7_days = db.query(CVSession).filter(CVSession.created_at >= seven_days_ago).count()
-        jobs_last_30_days = db.query(CVSession).filter(CVSession.created_at >= thirty_days_ago).count()
-        
-        # Performance metrics
-        high_performing_jobs = db.query(CVSession).filter(CVSession.original_score >= 80).count()
-        low_performing_jobs = db.query(CVSession).filter(CVSession.original_score < 50).count()
-        most_improved_jobs = db.query(CVSession).filter(
-            (CVSession.new_score - CVSession.original_score) >= 20
-        ).count()
-        
-        return {
-            "total_sessions": total_sessions,
-            "analyzed_sessions": analyzed_sessions,
-            "enhanced_sessions": enhanced_sessions,
-            "avg_original_score": round(score_stats.avg_original, 2) if score_stats.avg_original else 0,
-            "avg_enhanced_score": round(score_stats.avg_enhanced, 2) if score_stats.avg_enhanced else 0,
-            "avg_improvement": round((score_stats.avg_enhanced or 0) - (score_stats.avg_original or 0), 2),
-            "max_original_score": score_stats.max_original or 0,
-            "min_original_score": score_stats.min_original or 0,
-            "max_improvement": score_stats.max_improvement or 0,
+        result = {
+            "total_sessions": stats.total_sessions,
+            "analyzed_sessions": stats.analyzed_sessions or 0,
+            "enhanced_sessions": stats.enhanced_sessions or 0,
+            "avg_original_score": round(stats.avg_original, 2) if stats.avg_original else 0,
+            "avg_enhanced_score": round(stats.avg_enhanced, 2) if stats.avg_enhanced else 0,
+            "avg_improvement": round((stats.avg_enhanced or 0) - (stats.avg_original or 0), 2),
+            "max_original_score": stats.max_original or 0,
+            "min_original_score": stats.min_original or 0,
+            "max_improvement": stats.max_improvement or 0,
             "file_type_distribution": file_type_distribution,
             "top_job_titles": top_job_titles,
-            "jobs_last_7_days": jobs_last_7_days,
-            "jobs_last_30_days": jobs_last_30_days,
-            "high_performing_jobs": high_performing_jobs,
-            "low_performing_jobs": low_performing_jobs,
-            "most_improved_jobs": most_improved_jobs
+            "jobs_last_7_days": stats.jobs_last_7_days or 0,
+            "jobs_last_30_days": stats.jobs_last_30_days or 0,
+            "high_performing_jobs": stats.high_performing_jobs or 0,
+            "low_performing_jobs": stats.low_performing_jobs or 0,
+            "most_improved_jobs": stats.most_improved_jobs or 0
         }
+        
+        with _stats_cache_lock:
+            _stats_cache["stats"] = (time.monotonic() + STATS_CACHE_TTL, result)
+        return result
     
     @staticmethod
     def delete_session(db: Session, session_id: str) -> bool:
@@ -185,6 +296,7 @@ class CVSessionCRUD:
         if session:
             db.delete(session)
             db.commit()
+            _invalidate_stats_cache()
             return True
         return False
 
@@ -200,6 +312,15 @@ class UserCRUD:
         db.refresh(db_user)
         return db_user
     
+    @staticmethod
+    def create_users_bulk(db: Session, rows: List[Dict[str, Any]]) -> int:
+        """Insert many users at once using batched multi-row INSERTs."""
+        if not rows:
+            return 0
+        db.execute(insert(User), rows)
+        db.commit()
+        return len(rows)
+    
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email."""
@@ -209,3 +330,23 @@ class UserCRUD:
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID."""
         return db.query(User).filter(User.id == user_id).first()
+
+
+class LLMCacheCRUD:
+    """CRUD operations for cached OpenAI responses."""
+    
+    @staticmethod
+    def get(db: Session, key: str) -> Optional[Any]:
+        """Get a cached payload by key, or None on a cache miss."""
+        entry = db.get(LLMCache, key)
+        return entry.payload if entry else None
+    
+    @staticmethod
+    def put(db: Session, key: str, payload: Any) -> None:
+        """Store a payload, leaving any existing entry for the same key untouched."""
+        db.add(LLMCache(key=key, payload=payload))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request cached the same result first
+            db.rollback()
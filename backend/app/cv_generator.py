@@ -3,6 +3,20 @@ from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import RGBColor
 from typing import List, Dict, Any
+import re
+
+# Keywords that mark the first line of a CV block as a section header
+_SECTION_HEADER_RE = re.compile(r"experience|education|skills|projects|certifications", re.IGNORECASE)
+
+def _add_styled_paragraph(doc, text: str, style_id: str):
+    """Add a paragraph with an already-resolved style id.
+    
+    Passing a style name to add_paragraph makes python-docx rescan every style
+    definition for each paragraph, which dominates generation time on long CVs.
+    """
+    paragraph = doc.add_paragraph(text)
+    paragraph._p.style = style_id
+    return paragraph
 
 def generate_enhanced_cv(
     original_text: str, 
@@ -12,6 +26,8 @@ def generate_enhanced_cv(
 ) -> None:
     """Generate an enhanced CV in DOCX format with OpenAI-powered improvements."""
     doc = Document()
+    bullet_style = doc.styles['List Bullet'].style_id
+    heading_3_style = doc.styles['Heading 3'].style_id
     
     # Add title with formatting
     title = doc.add_heading('Enhanced Professional CV', 0)
@@ -30,21 +46,25 @@ def generate_enhanced_cv(
     # Split text into logical sections
     sections = original_text.split('\n\n')
     for section in sections:
-        if section.strip():
-            lines = section.strip().split('\n')
-            if len(lines) > 1 and lines[0].strip():
+        section = section.strip()
+        if section:
+            lines = section.split('\n')
+            header = lines[0].strip()
+            if len(lines) > 1 and header:
                 # Treat first line as potential section header
-                if any(keyword in lines[0].lower() for keyword in ['experience', 'education', 'skills', 'projects', 'certifications']):
-                    doc.add_heading(lines[0].strip(), level=2)
+                if _SECTION_HEADER_RE.search(header):
+                    doc.add_heading(header, level=2)
                     for line in lines[1:]:
-                        if line.strip():
-                            doc.add_paragraph(line.strip(), style='List Bullet')
+                        line = line.strip()
+                        if line:
+                            _add_styled_paragraph(doc, line, bullet_style)
                 else:
                     for line in lines:
-                        if line.strip():
-                            doc.add_paragraph(line.strip())
+                        line = line.strip()
+                        if line:
+                            doc.add_paragraph(line)
             else:
-                doc.add_paragraph(section.strip())
+                doc.add_paragraph(section)
     
     # Add additional information with enhancements
     if additional_info and additional_info.strip():
@@ -52,11 +72,11 @@ def generate_enhanced_cv(
         
         # Use improvement suggestions for skill presentation if available
         if improvement_suggestions and "skill_additions" in improvement_suggestions:
-            doc.add_paragraph("Enhanced Skill Presentation:", style='Heading 3')
+            _add_styled_paragraph(doc, "Enhanced Skill Presentation:", heading_3_style)
             for suggestion in improvement_suggestions["skill_additions"]:
-                doc.add_paragraph(suggestion, style='List Bullet')
+                _add_styled_paragraph(doc, suggestion, bullet_style)
         
-        doc.add_paragraph("Additional Details:", style='Heading 3')
+        _add_styled_paragraph(doc, "Additional Details:", heading_3_style)
         additional_sections = additional_info.split('\n\n')
         for section in additional_sections:
             if section.strip():
@@ -67,19 +87,19 @@ def generate_enhanced_cv(
         doc.add_heading('Professional Development Recommendations', level=1)
         
         if "recommendations" in improvement_suggestions:
-            doc.add_paragraph("Career Enhancement Suggestions:", style='Heading 3')
+            _add_styled_paragraph(doc, "Career Enhancement Suggestions:", heading_3_style)
             for rec in improvement_suggestions["recommendations"]:
-                doc.add_paragraph(rec, style='List Bullet')
+                _add_styled_paragraph(doc, rec, bullet_style)
         
         if "keyword_optimization" in improvement_suggestions:
-            doc.add_paragraph("Industry Keywords to Highlight:", style='Heading 3')
+            _add_styled_paragraph(doc, "Industry Keywords to Highlight:", heading_3_style)
             for keyword in improvement_suggestions["keyword_optimization"]:
-                doc.add_paragraph(keyword, style='List Bullet')
+                _add_styled_paragraph(doc, keyword, bullet_style)
         
         if "achievement_focus" in improvement_suggestions:
-            doc.add_paragraph("Achievement Enhancement Tips:", style='Heading 3')
+            _add_styled_paragraph(doc, "Achievement Enhancement Tips:", heading_3_style)
             for tip in improvement_suggestions["achievement_focus"]:
-                doc.add_paragraph(tip, style='List Bullet')
+                _add_styled_paragraph(doc, tip, bullet_style)
     
     # Add footer note
     doc.add_paragraph()
@@ -1,19 +1,63 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Index
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import List, Optional
+import orjson
 import os
+import uuid
 
 Base = declarative_base()
 
+class SessionId(TypeDecorator):
+    """CV session id: 16 raw UUID bytes on SQLite, a native UUID on Postgres.
+    
+    Ids are exposed as 32-character hex strings. Ids created before the switch
+    (temp file names) are not valid UUIDs and pass through unchanged as text;
+    SQLite's dynamic typing lets both kinds of value share the column.
+    """
+    impl = String(32)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(String(32))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value.hex if dialect.name == "postgresql" else value.bytes
+        if dialect.name == "postgresql":
+            return value
+        try:
+            return uuid.UUID(value).bytes
+        except (ValueError, AttributeError, TypeError):
+            # Legacy ids (temp file names) are stored as text
+            return value
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return uuid.UUID(value).hex
+        return value.hex() if isinstance(value, bytes) else value
+
 class CVSession(Base):
     """Database model for CV analysis sessions."""
     __tablename__ = "cv_sessions"
     
-    id = Column(String, primary_key=True)
+    id = Column(SessionId, primary_key=True)
     cv_text = Column(Text, nullable=False)
-    cv_file_type = Column(String, nullable=False)
+    cv_file_type = Column(String, nullable=False, index=True)
     cv_file_path = Column(String)
     
     # Job analysis data
@@ -35,8 +79,20 @@ class CVSession(Base):
     enhanced_cv_path = Column(String)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Score range filters combined with newest-first ordering
+        Index('ix_sessions_score_created', 'original_score', 'created_at'),
+        # Top job titles aggregation; partial so untitled sessions are not indexed
+        Index(
+            'ix_sessions_jobtitle',
+            'job_title',
+            sqlite_where=job_title.isnot(None),
+            postgresql_where=job_title.isnot(None)
+        ),
+    )
 
 class User(Base):
     """Database model for users (optional for future expansion)."""
@@ -48,14 +104,121 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime)
 
+class LLMCache(Base):
+    """Database model for cached OpenAI responses, keyed by a hash of the prompt inputs."""
+    __tablename__ = "llm_cache"
+    
+    key = Column(String(64), primary_key=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cv_analyzer.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Development checks (e.g. raise on access to columns that were not loaded)
+SQL_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+def _json_serializer(value) -> str:
+    """Serialize JSON columns with orjson instead of the stdlib encoder."""
+    return orjson.dumps(value).decode()
+
+_is_sqlite = DATABASE_URL.startswith("sqlite")
+# In-memory SQLite uses SingletonThreadPool, which takes no size/overflow/timeout settings
+_is_sqlite_memory = _is_sqlite and make_url(DATABASE_URL).database in (None, "", ":memory:")
+_pool_args = {} if _is_sqlite_memory else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": 30,
+}
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    insertmanyvalues_page_size=1000,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_pool_args
+)
+
+# Per-request SQL statement log used by the DEBUG query-count middleware
+MAX_QUERIES_PER_REQUEST = int(os.getenv("MAX_QUERIES_PER_REQUEST", "20"))
+_request_queries: ContextVar[Optional[List[str]]] = ContextVar("request_queries", default=None)
+
+if SQL_DEBUG:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        """Record each statement against the request that issued it."""
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.append(statement)
+
+@contextmanager
+def track_queries():
+    """Collect the SQL statements executed within this block (only recorded when DEBUG=true)."""
+    queries: List[str] = []
+    token = _request_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        _request_queries.reset(token)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Set by create_tables once the SQLite job title search index is in place
+_job_title_fts_ready = False
+
+def job_title_fts_ready() -> bool:
+    """Whether job title filters can use the cv_sessions_fts trigram index."""
+    return _job_title_fts_ready
+
+def _create_job_title_search_index():
+    """Index job titles for substring search (ILIKE '%...%' cannot use a B-tree index).
+    
+    SQLite gets an external-content FTS5 table with the trigram tokenizer, kept in
+    sync by triggers and rebuilt on startup (VACUUM may renumber cv_sessions rowids).
+    Postgres gets a pg_trgm GIN index, which its planner uses for ILIKE directly.
+    """
+    global _job_title_fts_ready
+    try:
+        with engine.begin() as conn:
+            if _is_sqlite:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS cv_sessions_fts USING fts5("
+                    "job_title, content='cv_sessions', content_rowid='rowid', tokenize='trigram')"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS cv_sessions_fts_insert AFTER INSERT ON cv_sessions BEGIN "
+                    "INSERT INTO cv_sessions_fts(rowid, job_title) VALUES (new.rowid, new.job_title); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS cv_sessions_fts_delete AFTER DELETE ON cv_sessions BEGIN "
+                    "INSERT INTO cv_sessions_fts(cv_sessions_fts, rowid, job_title) VALUES ('delete', old.rowid, old.job_title); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS cv_sessions_fts_update AFTER UPDATE OF job_title ON cv_sessions BEGIN "
+                    "INSERT INTO cv_sessions_fts(cv_sessions_fts, rowid, job_title) VALUES ('delete', old.rowid, old.job_title); "
+                    "INSERT INTO cv_sessions_fts(rowid, job_title) VALUES (new.rowid, new.job_title); END"
+                ))
+                conn.execute(text("INSERT INTO cv_sessions_fts(cv_sessions_fts) VALUES ('rebuild')"))
+                _job_title_fts_ready = True
+            elif engine.dialect.name == "postgresql":
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_sessions_jobtitle_trgm ON cv_sessions USING gin (job_title gin_trgm_ops)"
+                ))
+    except Exception as e:
+        # Job title filters fall back to a plain ILIKE scan
+        print(f"Job title search index not available: {e}")
+
 def create_tables():
     """Create all database tables if they don't exist."""
     Base.metadata.create_all(bind=engine, checkfirst=True)
+    # create_all skips tables that already exist, so add indexes introduced since then
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    _create_job_title_search_index()
 
 def get_db():
     """Get database session."""
@@ -1,12 +1,15 @@
 
 # FastAPI backend for CV Analyzer
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
+import asyncio
 import os
+import uuid
+from typing import Any, Dict
 from . import utils, openai_utils
-from .database import get_db, create_tables
+from .database import get_db, create_tables, track_queries, SQL_DEBUG, MAX_QUERIES_PER_REQUEST
 from .crud import CVSessionCRUD
 
 # Load environment variables
@@ -28,6 +31,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# In development, warn about requests that issue an unexpected number of SQL statements
+if SQL_DEBUG:
+    @app.middleware("http")
+    async def log_query_count(request: Request, call_next):
+        with track_queries() as queries:
+            response = await call_next(request)
+        if len(queries) > MAX_QUERIES_PER_REQUEST:
+            print(
+                f"⚠️ {request.method} {request.url.path} issued {len(queries)} SQL statements "
+                f"(limit {MAX_QUERIES_PER_REQUEST})"
+            )
+        return response
+
 @app.post("/api/analyze-cv")
 async def analyze_cv_complete(
     file: UploadFile = File(...),
@@ -35,7 +51,7 @@ async def analyze_cv_complete(
     target_job_title: str = Form(""),
     job_description: str = Form(...),
     db: Session = Depends(get_db)
-):
+) -> Dict[str, Any]:
     """
     Complete CV analysis endpoint that handles upload and analysis in one step.
     
@@ -44,12 +60,13 @@ async def analyze_cv_complete(
     """
     try:
         # Step 1: Upload and extract text from CV
-        temp_path = utils.save_temp_file(file)
-        text, filetype = utils.extract_text(temp_path)
-        session_id = os.path.basename(temp_path)
+        temp_path = await utils.save_temp_file_async(file)
+        text, filetype = await asyncio.to_thread(utils.extract_text_cached, temp_path)
+        session_id = uuid.uuid4().hex
         
-        # Step 2: Store in database
-        cv_session = CVSessionCRUD.create_session(
+        # Step 2: Store in database (session calls block, so they run in a worker thread)
+        cv_session = await asyncio.to_thread(
+            CVSessionCRUD.create_session,
             db=db,
             session_id=session_id,
             cv_text=text,
@@ -59,13 +76,14 @@ async def analyze_cv_complete(
         
         # Step 3: Analyze CV with AI
         job_title_to_use = target_job_title if target_job_title.strip() else current_job_title
-        analysis_result = openai_utils.analyze_cv(text, job_title_to_use, job_description)
+        analysis_result = await openai_utils.analyze_cv_async(text, job_title_to_use, job_description, db=db)
         
         # Unpack the tuple result from analyze_cv function
         (score, missing_skills, summary, strengths, experience_gaps, recommendations) = analysis_result
         
         # Step 4: Update session with analysis results
-        cv_session = CVSessionCRUD.update_analysis(
+        cv_session = await asyncio.to_thread(
+            CVSessionCRUD.update_analysis,
             db=db,
             session_id=session_id,
             job_title=job_title_to_use,
@@ -1,17 +1,40 @@
 import openai
+import asyncio
 import os
 import json
-from typing import Tuple, Dict, List, Any
+import orjson
+import functools
+import hashlib
+from typing import Tuple, Dict, List, Any, Optional
+from sqlalchemy.orm import Session
+from .crud import LLMCacheCRUD
 
-def get_openai_client():
-    """Get OpenAI client with API key from environment."""
+# Bump whenever a prompt changes so cached responses from the old prompt are ignored
+PROMPT_VERSION = "1"
+
+def _cache_key(kind: str, *parts: str) -> str:
+    """SHA-256 cache key over the prompt kind, prompt version and prompt inputs."""
+    raw = "\0".join((kind, PROMPT_VERSION) + parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client() -> openai.OpenAI:
+    """Get a shared OpenAI client (API key from environment) so HTTP connections are reused."""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
     return openai.OpenAI(api_key=api_key)
 
-def analyze_cv(cv_text: str, job_title: str, job_desc: str) -> Tuple[int, list, str]:
-    """Analyze CV against job description using OpenAI API with enhanced analysis."""
+@functools.lru_cache(maxsize=1)
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    """Get a shared AsyncOpenAI client so its connection pool is reused across requests."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+    return openai.AsyncOpenAI(api_key=api_key)
+
+def _build_analysis_messages(cv_text: str, job_title: str, job_desc: str) -> List[Dict[str, str]]:
+    """Build the chat messages for a CV analysis request."""
     prompt = f"""
 You are an expert HR professional and career advisor. Analyze the following CV against the job requirements and provide a comprehensive assessment.
 
@@ -39,46 +62,45 @@ Consider:
 - Career progression
 - Education relevance
 """
+    return [
+        {"role": "system", "content": "You are an expert HR professional with 15+ years of experience in talent acquisition and career development. Provide detailed, actionable feedback in valid JSON format."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _analysis_request(cv_text: str, job_title: str, job_desc: str) -> Dict[str, Any]:
+    """Chat completion arguments shared by analyze_cv and analyze_cv_async."""
+    return {
+        "model": "gpt-4o-mini",
+        "messages": _build_analysis_messages(cv_text, job_title, job_desc),
+        "temperature": 0.2,
+        "response_format": {"type": "json_object"},
+        "max_tokens": 1500,
+    }
+
+def _parse_analysis_response(content: str) -> Tuple[int, list, str, list, list, list]:
+    """Parse the JSON analysis returned by OpenAI into the analyze_cv result tuple."""
+    result = orjson.loads(content)
     
-    try:
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert HR professional with 15+ years of experience in talent acquisition and career development. Provide detailed, actionable feedback in valid JSON format."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=1500
-        )
-        content = response.choices[0].message.content.strip()
-        
-        # Clean up the response to ensure it's valid JSON
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        result = json.loads(content)
-        
-        # Ensure all required keys exist
-        required_keys = ["score", "missing_skills", "strengths", "experience_gaps", "recommendations", "summary"]
-        for key in required_keys:
-            if key not in result:
-                result[key] = [] if key != "score" and key != "summary" else (50 if key == "score" else "Analysis incomplete")
-        
-        return (
-            result["score"], 
-            result["missing_skills"], 
-            result["summary"],
-            result.get("strengths", []),
-            result.get("experience_gaps", []),
-            result.get("recommendations", [])
-        )
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        print(f"Raw response: {content if 'content' in locals() else 'No content'}")
+    # Ensure all required keys exist
+    required_keys = ["score", "missing_skills", "strengths", "experience_gaps", "recommendations", "summary"]
+    for key in required_keys:
+        if key not in result:
+            result[key] = [] if key != "score" and key != "summary" else (50 if key == "score" else "Analysis incomplete")
+    
+    return (
+        result["score"], 
+        result["missing_skills"], 
+        result["summary"],
+        result.get("strengths", []),
+        result.get("experience_gaps", []),
+        result.get("recommendations", [])
+    )
+
+def _analysis_fallback(error: Exception, content: str = None) -> Tuple[int, list, str, list, list, list]:
+    """Default analysis result returned when the OpenAI call or parsing fails."""
+    if isinstance(error, json.JSONDecodeError):
+        print(f"JSON parsing error: {error}")
+        print(f"Raw response: {content if content is not None else 'No content'}")
         return (
             50, 
             ["Analysis parsing failed"], 
@@ -87,20 +109,74 @@ Consider:
             ["Technical issue occurred"],
             ["Contact support if problem persists"]
         )
+    # Return default values if OpenAI API fails
+    print(f"OpenAI API error: {error}")
+    return (
+        50, 
+        ["Unable to analyze - API error"], 
+        f"Analysis failed: {str(error)}",
+        [],
+        [],
+        ["Please check your OpenAI API key and try again"]
+    )
+
+def analyze_cv(cv_text: str, job_title: str, job_desc: str, db: Optional[Session] = None) -> Tuple[int, list, str, list, list, list]:
+    """Analyze CV against job description using OpenAI API with enhanced analysis.
+    
+    When a database session is given, results are cached by the hash of the inputs.
+    """
+    cache_key = _cache_key("analysis", cv_text, job_title, job_desc)
+    if db is not None:
+        cached = LLMCacheCRUD.get(db, cache_key)
+        if cached is not None:
+            return tuple(cached)
+    
+    content = None
+    try:
+        client = get_openai_client()
+        response = client.chat.completions.create(**_analysis_request(cv_text, job_title, job_desc))
+        content = response.choices[0].message.content
+        result = _parse_analysis_response(content)
     except Exception as e:
-        # Return default values if OpenAI API fails
-        print(f"OpenAI API error: {e}")
-        return (
-            50, 
-            ["Unable to analyze - API error"], 
-            f"Analysis failed: {str(e)}",
-            [],
-            [],
-            ["Please check your OpenAI API key and try again"]
-        )
+        return _analysis_fallback(e, content)
+    
+    if db is not None:
+        LLMCacheCRUD.put(db, cache_key, list(result))
+    return result
 
-def generate_cv_improvement_suggestions(cv_text: str, additional_info: str, missing_skills: List[str]) -> Dict[str, Any]:
-    """Generate specific suggestions for CV improvement using OpenAI."""
+async def analyze_cv_async(cv_text: str, job_title: str, job_desc: str, db: Optional[Session] = None) -> Tuple[int, list, str, list, list, list]:
+    """Async variant of analyze_cv that does not block the event loop while waiting on OpenAI."""
+    cache_key = _cache_key("analysis", cv_text, job_title, job_desc)
+    if db is not None:
+        # Session queries and commits are blocking, keep them off the event loop
+        cached = await asyncio.to_thread(LLMCacheCRUD.get, db, cache_key)
+        if cached is not None:
+            return tuple(cached)
+    
+    content = None
+    try:
+        client = get_async_openai_client()
+        response = await client.chat.completions.create(**_analysis_request(cv_text, job_title, job_desc))
+        content = response.choices[0].message.content
+        result = _parse_analysis_response(content)
+    except Exception as e:
+        return _analysis_fallback(e, content)
+    
+    if db is not None:
+        await asyncio.to_thread(LLMCacheCRUD.put, db, cache_key, list(result))
+    return result
+
+def generate_cv_improvement_suggestions(cv_text: str, additional_info: str, missing_skills: List[str], db: Optional[Session] = None) -> Dict[str, Any]:
+    """Generate specific suggestions for CV improvement using OpenAI.
+    
+    When a database session is given, results are cached by the hash of the inputs.
+    """
+    cache_key = _cache_key("suggestions", cv_text, additional_info, json.dumps(missing_skills))
+    if db is not None:
+        cached = LLMCacheCRUD.get(db, cache_key)
+        if cached is not None:
+            return cached
+    
     prompt = f"""
 You are a professional CV writer and career coach. Based on the original CV and additional information provided, generate specific improvement suggestions.
 
@@ -134,18 +210,10 @@ Focus on making the CV more ATS-friendly and appealing to hiring managers.
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
+            response_format={"type": "json_object"},
             max_tokens=1000
         )
-        content = response.choices[0].message.content.strip()
-        
-        # Clean up the response to ensure it's valid JSON
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        return json.loads(content)
+        suggestions = orjson.loads(response.choices[0].message.content)
     except Exception as e:
         print(f"CV improvement suggestions error: {e}")
         return {
@@ -157,4 +225,7 @@ Focus on making the CV more ATS-friendly and appealing to hiring managers.
             "achievement_focus": ["Highlight impact and results achieved"],
             "error": f"Enhancement failed: {str(e)}"
         }
-
+    
+    if db is not None:
+        LLMCacheCRUD.put(db, cache_key, suggestions)
+    return suggestions
@@ -1,58 +1,226 @@
 import os
+import functools
+import hashlib
+import multiprocessing
+import shutil
 import tempfile
-import pdfplumber
-import docx
-import mammoth
-from PIL import Image
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from pathlib import Path
 from fastapi import UploadFile
-from typing import Tuple
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
 
-# Try to import pytesseract, but make it optional
-TESSERACT_AVAILABLE = False
-try:
-    import pytesseract
-    # Test if tesseract is actually working
-    pytesseract.get_tesseract_version()
-    TESSERACT_AVAILABLE = True
-except Exception as e:
-    # If any error occurs, Tesseract is not available
-    print(f"Tesseract not available: {e}")
-    TESSERACT_AVAILABLE = False
+# Upload limits for save_temp_file_async
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# PDFs with at least this many pages are extracted page-by-page in worker processes
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+
+# Large Tesseract file lists can stall, so batch OCR is split into chunks of this size
+OCR_BATCH_SIZE = 50
+
+# Images are converted to greyscale and their long edge capped at this size before OCR
+OCR_MAX_DIMENSION = 2000
+
+# On-disk cache of extracted text, keyed by file contents (0 disables it)
+TEXT_CACHE_DIR = os.path.expanduser(os.getenv("TEXT_CACHE_DIR", os.path.join("~", ".cache", "fastcvai")))
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "500"))
+# Bump whenever extraction output changes (parsing, OCR preprocessing, OCR_MAX_DIMENSION, ...)
+# so cached text from the old extractors is ignored
+EXTRACTOR_VERSION = "1"
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = f"{_W_NS}p"
+_W_TEXT = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_BREAK = f"{_W_NS}br"
+# Word 2010+ stores text boxes twice in mc:AlternateContent (a DrawingML mc:Choice and a
+# VML mc:Fallback); only the fallback copy is read, as mammoth does
+_MC_CHOICE = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Choice"
+
+# Tesseract's OpenMP threads contend with each other when several requests OCR at once.
+# Run each tesseract process single-threaded; concurrency comes from uvicorn workers
+# and the request thread pool instead.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Extractor libraries (pdfminer, python-docx, lxml, Pillow, pytesseract) are imported
+# inside the functions that use them so the API starts without loading all of them.
+
+@functools.lru_cache(maxsize=1)
+def tesseract_available() -> bool:
+    """Check once, on first use, whether pytesseract and the tesseract binary work."""
+    try:
+        import pytesseract
+        # Test if tesseract is actually working
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception as e:
+        # If any error occurs, Tesseract is not available
+        print(f"Tesseract not available: {e}")
+        return False
+
+@functools.lru_cache(maxsize=1)
+def pymupdf_available() -> bool:
+    """Whether the optional PyMuPDF package can be imported."""
+    try:
+        import pymupdf
+        return True
+    except ImportError:
+        return False
+
+def warm_extractors() -> None:
+    """Import the extractor libraries now instead of on first use."""
+    import docx
+    import pdfminer.high_level
+    import pdfminer.pdfpage
+    from lxml import etree
+    from PIL import Image, ImageOps
+    pymupdf_available()
+    tesseract_available()
+
+# With gunicorn --preload, load everything in the master so forked workers share it.
+# Spawned PDF pool workers inherit PRELOAD but import this module only to run
+# _extract_page, so they skip the warm-up.
+if os.getenv("PRELOAD") == "1" and multiprocessing.parent_process() is None:
+    warm_extractors()
 
 def save_temp_file(uploaded_file: UploadFile) -> str:
     """Save uploaded file to temporary location."""
     suffix = os.path.splitext(uploaded_file.filename)[1]
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = uploaded_file.file.read()
-        tmp.write(content)
-        # Reset file pointer for potential re-reading
-        uploaded_file.file.seek(0)
+        shutil.copyfileobj(uploaded_file.file, tmp, length=UPLOAD_CHUNK_SIZE)
         return tmp.name
 
+def _format_size(num_bytes: int) -> str:
+    """Human-readable size for error messages, e.g. "10 MB", "97.7 KB" or "512 bytes"."""
+    if num_bytes >= 1024 * 1024:
+        return f"{round(num_bytes / (1024 * 1024), 1):g} MB"
+    if num_bytes >= 1024:
+        return f"{round(num_bytes / 1024, 1):g} KB"
+    return f"{num_bytes} bytes"
+
+async def save_temp_file_async(uploaded_file: UploadFile) -> str:
+    """Stream uploaded file to a temporary location in chunks without blocking the event loop."""
+    too_large = f"File is too large. Maximum upload size is {_format_size(MAX_UPLOAD_SIZE)}."
+    if uploaded_file.size is not None and uploaded_file.size > MAX_UPLOAD_SIZE:
+        raise ValueError(too_large)
+    
+    suffix = os.path.splitext(uploaded_file.filename)[1]
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    try:
+        with tmp:
+            written = 0
+            while chunk := await uploaded_file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_UPLOAD_SIZE:
+                    raise ValueError(too_large)
+                await run_in_threadpool(tmp.write, chunk)
+    except Exception:
+        os.remove(tmp.name)
+        raise
+    return tmp.name
+
+@functools.lru_cache(maxsize=1)
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Shared process pool for PDF extraction, created on first use."""
+    # spawn avoids forking a process that is already running server threads
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+def _extract_page(file_path: str, page_idx: int) -> str:
+    """Extract text from a single PDF page (runs in a worker process)."""
+    from pdfminer.high_level import extract_text as _pdfminer_extract
+    return _pdfminer_extract(file_path, page_numbers=[page_idx])
+
+def _extract_pdf_with_pymupdf(file_path: str) -> Optional[str]:
+    """Extract PDF text with PyMuPDF when it is installed, otherwise return None."""
+    try:
+        import pymupdf
+    except ImportError:
+        return None
+    try:
+        with pymupdf.open(file_path) as doc:
+            return "\n".join(page.get_text() for page in doc)
+    except Exception as e:
+        print(f"PyMuPDF extraction failed: {e}, falling back to pdfminer")
+        return None
+
 def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+    # MuPDF's C text extractor is much faster than pdfminer when available
+    text = _extract_pdf_with_pymupdf(file_path)
+    if text is not None:
+        return text
+
+    from pdfminer.high_level import extract_text as _pdfminer_extract
+    from pdfminer.pdfpage import PDFPage
+
+    with open(file_path, "rb") as fp:
+        n_pages = sum(1 for _ in PDFPage.get_pages(fp))
+    if n_pages < PDF_PARALLEL_MIN_PAGES:
+        return _pdfminer_extract(file_path)
+
+    # pdfminer layout analysis is CPU-bound Python, so spread pages across processes
+    try:
+        results = _get_pdf_executor().map(_extract_page, repeat(file_path, n_pages), range(n_pages))
+        return "".join(results)
+    except BrokenProcessPool as e:
+        # A worker died (e.g. OOM-killed); drop the pool so the next PDF gets a fresh one
+        print(f"PDF worker pool broken: {e}, extracting in-process")
+        _get_pdf_executor.cache_clear()
+        return _pdfminer_extract(file_path)
+
+def _extract_docx_paragraphs(file_path: str) -> str:
+    """Stream paragraph text straight out of word/document.xml."""
+    from lxml import etree
+
+    parts = []
+    choice_depth = 0
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document:
+        events = etree.iterparse(
+            document, events=("start", "end"), tag=(_W_PARAGRAPH, _MC_CHOICE), resolve_entities=False
+        )
+        for event, el in events:
+            if el.tag == _MC_CHOICE:
+                if event == "start":
+                    choice_depth += 1
+                else:
+                    choice_depth -= 1
+                    el.clear()
+            elif event == "end":
+                if not choice_depth:
+                    pieces = []
+                    for node in el.iter(_W_TEXT, _W_TAB, _W_BREAK):
+                        if node.tag == _W_TEXT:
+                            pieces.append(node.text or "")
+                        else:
+                            pieces.append("\t" if node.tag == _W_TAB else "\n")
+                    para_text = "".join(pieces)
+                    if para_text.strip():
+                        parts.append(para_text)
+                el.clear()
+    return "\n".join(parts)
 
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract text from DOCX files using mammoth for better formatting support."""
+    """Extract text from DOCX files, reading the document XML directly when possible."""
     try:
-        # First try mammoth for better text extraction from complex documents
-        with open(file_path, "rb") as docx_file:
-            result = mammoth.extract_raw_text(docx_file)
-            text = result.value.strip()
-            
-            # If mammoth extracted meaningful text, use it
-            if text and len(text) > 10:  # More than just whitespace/minimal content
-                return text
+        text = _extract_docx_paragraphs(file_path).strip()
+        
+        # If the fast path extracted meaningful text, use it
+        if text and len(text) > 10:  # More than just whitespace/minimal content
+            return text
                 
     except Exception as e:
-        print(f"Mammoth extraction failed: {e}, falling back to python-docx")
+        print(f"Fast DOCX extraction failed: {e}, falling back to python-docx")
     
     # Fallback to python-docx method
     try:
+        import docx
         doc = docx.Document(file_path)
         text_parts = []
         
@@ -106,25 +274,81 @@ def extract_text_from_docx(file_path: str) -> str:
     except Exception as e:
         return f"⚠️ Error extracting text from DOCX: {str(e)}"
 
-def extract_text_from_image(file_path: str) -> str:
-    """Extract text from image using OCR."""
-    # Double-check Tesseract availability at runtime
-    try:
-        import pytesseract
-        pytesseract.get_tesseract_version()
-    except Exception as e:
+def _require_tesseract() -> None:
+    if not tesseract_available():
         raise ValueError(
-            f"Image text extraction is not available: {str(e)}. "
+            "Image text extraction is not available: Tesseract OCR is not installed. "
             "Please install Tesseract OCR: 'brew install tesseract' (macOS) or "
             "visit https://github.com/tesseract-ocr/tesseract for installation instructions."
         )
+
+def _preprocess_ocr_image(image):
+    """Greyscale, downscale and contrast-stretch an opened PIL image for Tesseract.
+
+    Keep pixel-level steps on Pillow operations (convert, point lookup tables,
+    ImageOps, ImageFilter), which run in C, rather than Python loops over pixels.
+    """
+    from PIL import Image, ImageOps
+
+    # Let the JPEG decoder produce a reduced greyscale image directly
+    image.draft("L", (OCR_MAX_DIMENSION, OCR_MAX_DIMENSION))
+    # Flatten transparency onto white first, as pytesseract does; converting an
+    # alpha image straight to "L" would turn transparent areas black
+    if "A" in image.getbands() or "transparency" in image.info:
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    image = image.convert("L")
+    image.thumbnail((OCR_MAX_DIMENSION, OCR_MAX_DIMENSION), Image.Resampling.LANCZOS)
+    return ImageOps.autocontrast(image)
+
+def extract_text_from_image(file_path: str) -> str:
+    """Extract text from image using OCR."""
+    _require_tesseract()
+    import pytesseract
+    from PIL import Image
     
     try:
-        image = Image.open(file_path)
-        return pytesseract.image_to_string(image)
+        with Image.open(file_path) as image:
+            return pytesseract.image_to_string(_preprocess_ocr_image(image))
     except Exception as e:
         raise ValueError(f"Failed to extract text from image: {str(e)}")
 
+def extract_text_from_images_batch(file_paths: List[str]) -> List[str]:
+    """Extract text from several images with one Tesseract run per batch.
+
+    Tesseract accepts a text file listing image paths and separates the
+    output of each image with a form feed, so start-up cost is paid once
+    per batch instead of once per image. Each image is preprocessed the
+    same way as in extract_text_from_image, so both give the same text.
+    """
+    _require_tesseract()
+    import pytesseract
+    from PIL import Image
+
+    results: List[str] = []
+    for start in range(0, len(file_paths), OCR_BATCH_SIZE):
+        batch = file_paths[start:start + OCR_BATCH_SIZE]
+        try:
+            with tempfile.TemporaryDirectory() as work_dir:
+                prepared = []
+                for i, path in enumerate(batch):
+                    prepared_path = os.path.join(work_dir, f"{i}.png")
+                    with Image.open(path) as image:
+                        _preprocess_ocr_image(image).save(prepared_path)
+                    prepared.append(prepared_path)
+                list_path = os.path.join(work_dir, "images.txt")
+                with open(list_path, "w") as list_file:
+                    list_file.write("\n".join(prepared))
+                output = pytesseract.image_to_string(list_path)
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from images: {str(e)}")
+
+        pages = output.split("\f")
+        pages += [""] * (len(batch) - len(pages))
+        results.extend(pages[:len(batch)])
+    return results
+
 def extract_text(file_path: str) -> Tuple[str, str]:
     """Extract text from various file formats."""
     ext = os.path.splitext(file_path)[1].lower()
@@ -134,32 +358,80 @@ def extract_text(file_path: str) -> Tuple[str, str]:
     elif ext == ".docx":
         return extract_text_from_docx(file_path), "docx"
     elif ext in [".jpg", ".jpeg", ".png"]:
-        # Runtime check for Tesseract availability
-        try:
-            import pytesseract
-            pytesseract.get_tesseract_version()
-            return extract_text_from_image(file_path), "image"
-        except Exception as e:
+        if not tesseract_available():
             raise ValueError(
-                f"Image file upload is not supported: {str(e)}. "
+                "Image file upload is not supported: Tesseract OCR is not installed. "
                 "Please use PDF, DOCX, or TXT files instead. "
                 "To enable image support, install Tesseract: 'brew install tesseract' (macOS)"
             )
+        return extract_text_from_image(file_path), "image"
     elif ext == ".txt":
         return extract_text_from_txt(file_path), "txt"
     else:
-        # Check if images would be supported for the error message
-        image_support = ""
+        image_support = " and images (JPG, PNG)" if tesseract_available() else ""
+        raise ValueError(f"Unsupported file type: {ext}. Supported formats: PDF, DOCX, TXT{image_support}")
+
+def _text_cache_path(file_path: str) -> str:
+    """Cache file for an upload, keyed by its contents, extension and the extractor in use."""
+    ext = os.path.splitext(file_path)[1].lower()
+    # PDFs come out differently from PyMuPDF and pdfminer, so installing it changes the key
+    extractor = f"{EXTRACTOR_VERSION}:{'pymupdf' if ext == '.pdf' and pymupdf_available() else 'default'}"
+    hasher = hashlib.blake2b(f"{extractor}\0".encode(), digest_size=20)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return os.path.join(TEXT_CACHE_DIR, f"{hasher.hexdigest()}{ext}.txt")
+
+def _prune_text_cache() -> None:
+    """Drop the least recently used entries once the cache grows past its limit."""
+    with os.scandir(TEXT_CACHE_DIR) as it:
+        entries = [entry for entry in it if entry.name.endswith(".txt")]
+    if len(entries) <= TEXT_CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - TEXT_CACHE_MAX_ENTRIES]:
         try:
-            import pytesseract
-            pytesseract.get_tesseract_version()
-            image_support = " and images (JPG, PNG)"
-        except:
+            os.remove(entry.path)
+        except FileNotFoundError:
             pass
-        
-        raise ValueError(f"Unsupported file type: {ext}. Supported formats: PDF, DOCX, TXT{image_support}")
+
+def extract_text_cached(file_path: str) -> Tuple[str, str]:
+    """Like extract_text, but reuses the result for files that were extracted before."""
+    if TEXT_CACHE_MAX_ENTRIES <= 0:
+        return extract_text(file_path)
+
+    cache_path = _text_cache_path(file_path)
+    try:
+        with open(cache_path, "r", encoding="utf-8", newline="") as f:
+            filetype = f.readline().rstrip("\n")
+            text = f.read()
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            # Mark the entry as recently used for pruning; a read-only cache still serves hits
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return text, filetype
+
+    text, filetype = extract_text(file_path)
+    # Don't cache extraction warnings, the next upload may succeed
+    if text.startswith("⚠️"):
+        return text, filetype
+
+    try:
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", dir=TEXT_CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            tmp.write(f"{filetype}\n{text}")
+        os.replace(tmp.name, cache_path)
+        _prune_text_cache()
+    except OSError as e:
+        print(f"⚠️ Could not write text cache: {e}")
+    return text, filetype
 
 def extract_text_from_txt(file_path: str) -> str:
     """Extract text from a plain text file."""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return file.read()
+    text = Path(file_path).read_bytes().decode('utf-8', errors='replace')
+    # Match text-mode reads, which translate Windows/Mac line endings
+    return text.replace('\r\n', '\n').replace('\r', '\n')
@@ -4,6 +4,7 @@ Database management script for CV Analyzer.
 Provides utilities for database operations.
 """
 
+import io
 import os
 import sys
 from pathlib import Path
@@ -12,10 +13,20 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from app.database import create_tables, SessionLocal, engine
+from app.database import create_tables, SessionLocal, engine, CVSession
 from app.crud import CVSessionCRUD, UserCRUD
 from sqlalchemy import text
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent file existence checks in clean_db (helps on network storage)
+FILE_CHECK_WORKERS = 32
+
+# list_sessions row layout and rule, and how many rows are buffered before writing to stdout
+# (ID is wide enough for 32-character hex session ids)
+LIST_ROW_FORMAT = "{:<32} {:<20} {:<8} {:<8} {:<6} {:<12} {:<10}\n".format
+LIST_RULE = "=" * 102
+LIST_FLUSH_ROWS = 500
 
 def create_db():
     """Create database tables."""
@@ -23,30 +34,42 @@ def create_db():
     create_tables()
     print("Database tables created successfully!")
 
-def list_sessions():
-    """List all CV sessions with detailed information."""
+def list_sessions(limit: int = None, offset: int = 0):
+    """List CV sessions with detailed information, newest first (all of them unless limited)."""
     db = SessionLocal()
     try:
-        sessions = CVSessionCRUD.get_all_sessions(db)
-        print(f"\nFound {len(sessions)} CV analysis jobs:")
-        print("=" * 100)
-        print(f"{'ID':<15} {'Job Title':<20} {'Score':<8} {'Improved':<8} {'Type':<6} {'Created':<12} {'Status':<10}")
-        print("=" * 100)
+        sessions = CVSessionCRUD.get_all_sessions_streaming(db, limit=limit, offset=offset, columns=[
+            CVSession.id, CVSession.job_title, CVSession.original_score, CVSession.cv_file_type,
+            CVSession.created_at, CVSession.enhanced_cv_path,
+            (CVSession.new_score - CVSession.original_score).label("improvement")
+        ])
+        print("\nCV analysis jobs:")
+        print(LIST_RULE)
+        print(LIST_ROW_FORMAT("ID", "Job Title", "Score", "Improved", "Type", "Created", "Status"), end="")
+        print(LIST_RULE)
         
+        # Rows are written to a buffer and flushed once per streamed batch instead of per row
+        buffer = io.StringIO()
+        session_count = 0
         for session in sessions:
+            session_count += 1
             job_title = (session.job_title or "N/A")[:19]
             original_score = f"{session.original_score or 0}/100"
-            improvement = f"+{session.new_score - session.original_score}" if session.new_score and session.original_score else "N/A"
+            improvement = f"+{session.improvement}" if session.improvement is not None else "N/A"
             file_type = session.cv_file_type
             created = session.created_at.strftime("%Y-%m-%d")
             
             # Determine status
             status = "Complete" if session.enhanced_cv_path else "Analyzed" if session.original_score else "Uploaded"
             
-            print(f"{session.id:<15} {job_title:<20} {original_score:<8} {improvement:<8} {file_type:<6} {created:<12} {status:<10}")
+            buffer.write(LIST_ROW_FORMAT(session.id, job_title, original_score, improvement, file_type, created, status))
+            if session_count % LIST_FLUSH_ROWS == 0:
+                sys.stdout.write(buffer.getvalue())
+                buffer = io.StringIO()
+        sys.stdout.write(buffer.getvalue())
             
-        print("=" * 100)
-        print(f"Summary: {len(sessions)} total jobs")
+        print(LIST_RULE)
+        print(f"Summary: {session_count} total jobs")
         
     finally:
         db.close()
@@ -55,19 +78,29 @@ def clean_db():
     """Clean up old sessions and orphaned files."""
     db = SessionLocal()
     try:
-        sessions = CVSessionCRUD.get_all_sessions(db)
+        sessions = CVSessionCRUD.get_all_sessions(db, load_columns=[
+            CVSession.id, CVSession.cv_file_path, CVSession.enhanced_cv_path
+        ])
         cleaned_files = 0
         
+        # stat() calls release the GIL, so check all referenced files concurrently
+        paths = list({
+            path for session in sessions
+            for path in (session.cv_file_path, session.enhanced_cv_path) if path
+        })
+        with ThreadPoolExecutor(max_workers=FILE_CHECK_WORKERS) as executor:
+            exists = dict(zip(paths, executor.map(os.path.exists, paths)))
+        
         for session in sessions:
             # Check and clean up CV files
-            if session.cv_file_path and os.path.exists(session.cv_file_path):
+            if session.cv_file_path and exists[session.cv_file_path]:
                 # Keep files for now, just report
                 pass
             elif session.cv_file_path:
                 print(f"Orphaned CV file reference: {session.cv_file_path}")
                 
             # Check enhanced CV files
-            if session.enhanced_cv_path and os.path.exists(session.enhanced_cv_path):
+            if session.enhanced_cv_path and exists[session.enhanced_cv_path]:
                 # Keep files for now, just report
                 pass
             elif session.enhanced_cv_path:
@@ -96,24 +129,18 @@ def show_stats():
     """Show database statistics."""
     db = SessionLocal()
     try:
-        # Get session count
-        result = db.execute(text("SELECT COUNT(*) FROM cv_sessions")).fetchone()
-        session_count = result[0] if result else 0
-        
-        # Get sessions with analysis
-        result = db.execute(text("SELECT COUNT(*) FROM cv_sessions WHERE original_score IS NOT NULL")).fetchone()
-        analyzed_count = result[0] if result else 0
-        
-        # Get sessions with enhancement
-        result = db.execute(text("SELECT COUNT(*) FROM cv_sessions WHERE enhanced_cv_path IS NOT NULL")).fetchone()
-        enhanced_count = result[0] if result else 0
-        
-        # Get average scores
-        result = db.execute(text("SELECT AVG(original_score) FROM cv_sessions WHERE original_score IS NOT NULL")).fetchone()
-        avg_original_score = round(result[0], 2) if result and result[0] else 0
-        
-        result = db.execute(text("SELECT AVG(new_score) FROM cv_sessions WHERE new_score IS NOT NULL")).fetchone()
-        avg_new_score = round(result[0], 2) if result and result[0] else 0
+        # Counts and average scores in a single pass (AVG skips NULL scores)
+        session_count, analyzed_count, enhanced_count, avg_original, avg_new = db.execute(text(
+            "SELECT COUNT(*), "
+            "SUM(CASE WHEN original_score IS NOT NULL THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN enhanced_cv_path IS NOT NULL THEN 1 ELSE 0 END), "
+            "AVG(original_score), AVG(new_score) "
+            "FROM cv_sessions"
+        )).fetchone()
+        analyzed_count = analyzed_count or 0
+        enhanced_count = enhanced_count or 0
+        avg_original_score = round(avg_original, 2) if avg_original else 0
+        avg_new_score = round(avg_new, 2) if avg_new else 0
         
         print("\n📊 Database Statistics")
         print("=" * 50)
@@ -131,13 +158,15 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CV Analyzer Database Management")
     parser.add_argument("command", choices=["create", "list", "clean", "reset", "stats"], 
                        help="Database operation to perform")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of sessions to list (default: all)")
+    parser.add_argument("--offset", type=int, default=0, help="Number of sessions to skip when listing")
     
     args = parser.parse_args()
     
     if args.command == "create":
         create_db()
     elif args.command == "list":
-        list_sessions()
+        list_sessions(args.limit, args.offset)
     elif args.command == "clean":
         clean_db()
     elif args.command == "reset":
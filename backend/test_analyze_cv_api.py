@@ -4,9 +4,13 @@ Test script for the new /api/analyze-cv endpoint
 This endpoint handles both upload and analysis in one step.
 """
 
+import io
 import requests
 import json
 
+# Shared session so every request reuses the same keep-alive connection
+SESSION = requests.Session()
+
 def test_analyze_cv_api():
     """Test the complete CV analysis API endpoint."""
     
@@ -58,21 +62,16 @@ def test_analyze_cv_api():
         '''
     }
     
-    # Create a temporary CV file
-    cv_filename = "sample_cv.txt"
-    with open(cv_filename, "w") as f:
-        f.write(sample_cv_content)
-    
     try:
-        # Test the new API endpoint
-        with open(cv_filename, "rb") as cv_file:
-            files = {'file': ('sample_cv.txt', cv_file, 'text/plain')}
-            
-            response = requests.post(
-                f"{base_url}/api/analyze-cv",
-                files=files,
-                data=test_data
-            )
+        # Test the new API endpoint, sending the CV straight from memory
+        cv_file = io.BytesIO(sample_cv_content.encode("utf-8"))
+        files = {'file': ('sample_cv.txt', cv_file, 'text/plain')}
+        
+        response = SESSION.post(
+            f"{base_url}/api/analyze-cv",
+            files=files,
+            data=test_data
+        )
         
         print(f"📡 Response Status: {response.status_code}")
         
@@ -139,12 +138,6 @@ def test_analyze_cv_api():
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}")
     
-    finally:
-        # Clean up test file
-        import os
-        if os.path.exists(cv_filename):
-            os.remove(cv_filename)
-    
     # Test image support (new addition)
     print("\n" + "="*60)
     print("🖼️ Testing Image OCR Support...")
@@ -152,7 +145,6 @@ def test_analyze_cv_api():
     
     try:
         from PIL import Image, ImageDraw, ImageFont
-        import tempfile
         
         # Create a test image with CV text
         img = Image.new('RGB', (600, 200), color='white')
@@ -168,25 +160,24 @@ def test_analyze_cv_api():
         cv_text = "Jane Smith\nData Scientist\n\nExperience:\n• 2 years in Python and Machine Learning\n• Worked with pandas, numpy, sklearn"
         draw.text((20, 20), cv_text, fill='black', font=font)
         
-        # Save as temporary file
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_img:
-            img.save(tmp_img.name, 'PNG')
-            img_filename = tmp_img.name
+        # Encode the image in memory
+        img_file = io.BytesIO()
+        img.save(img_file, 'PNG')
+        img_file.seek(0)
         
         # Test the API with image
-        with open(img_filename, "rb") as img_file:
-            files = {'file': ('cv_image.png', img_file, 'image/png')}
-            test_data_img = {
-                'current_job_title': 'Data Scientist',
-                'target_job_title': 'Senior Data Scientist',
-                'job_description': 'Looking for an experienced data scientist with Python and ML skills.'
-            }
-            
-            response = requests.post(
-                f"{base_url}/api/analyze-cv",
-                files=files,
-                data=test_data_img
-            )
+        files = {'file': ('cv_image.png', img_file, 'image/png')}
+        test_data_img = {
+            'current_job_title': 'Data Scientist',
+            'target_job_title': 'Senior Data Scientist',
+            'job_description': 'Looking for an experienced data scientist with Python and ML skills.'
+        }
+        
+        response = SESSION.post(
+            f"{base_url}/api/analyze-cv",
+            files=files,
+            data=test_data_img
+        )
         
         print(f"📡 Image Response Status: {response.status_code}")
         
@@ -200,15 +191,10 @@ def test_analyze_cv_api():
             error = response.json()
             print(f"❌ Image analysis failed: {error.get('detail', 'Unknown error')}")
         
-        # Clean up image file
-        os.remove(img_filename)
-        
     except ImportError:
         print("⚠️ PIL not available for image testing")
     except Exception as e:
         print(f"⚠️ Image test error: {str(e)}")
-        if 'img_filename' in locals() and os.path.exists(img_filename):
-            os.remove(img_filename)
 
 if __name__ == "__main__":
     test_analyze_cv_api()
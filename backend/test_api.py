@@ -4,23 +4,34 @@ Enhanced test script for CV Analyzer API endpoints with OpenAI integration.
 Run this after starting the FastAPI server to test the enhanced functionality.
 """
 
-import requests
+import asyncio
+import httpx
 import json
-import os
+import sys
 
 BASE_URL = "http://localhost:8000"
 
-def test_health_check():
+# The OpenAI-backed endpoints can take a while to respond
+TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+def emit(lines):
+    """Write a test's collected output lines in a single call, so concurrent tests don't interleave."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+async def test_health_check(client: httpx.AsyncClient):
     """Test the health check endpoint."""
-    print("Testing health check...")
-    response = requests.get(f"{BASE_URL}/")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
-    print("-" * 50)
+    out = []
+    out.append("Testing health check...")
+    response = await client.get("/")
+    out.append(f"Status: {response.status_code}")
+    out.append(f"Response: {response.json()}")
+    out.append("-" * 50)
+    emit(out)
 
-def test_upload_cv():
+async def test_upload_cv(client: httpx.AsyncClient):
     """Test CV upload with a more realistic sample CV."""
-    print("Testing CV upload...")
+    out = []
+    out.append("Testing CV upload...")
     
     # Create a more realistic sample CV
     sample_cv = """
@@ -63,38 +74,32 @@ Projects:
 - Task Management App: React-based project management tool
 """
     
-    with open("sample_cv.txt", "w") as f:
-        f.write(sample_cv)
+    files = {"file": ("sample_cv.txt", sample_cv.encode("utf-8"), "text/plain")}
+    response = await client.post("/upload-cv", files=files)
     
-    try:
-        with open("sample_cv.txt", "rb") as f:
-            files = {"file": ("sample_cv.txt", f, "text/plain")}
-            response = requests.post(f"{BASE_URL}/upload-cv", files=files)
-        
-        print(f"Status: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Session ID: {data.get('session_id')}")
-            print(f"CV Text Preview: {data.get('cv_text')[:200]}...")
-            return data.get('session_id')
-        else:
-            print(f"Error: {response.text}")
-    
-    finally:
-        # Clean up
-        if os.path.exists("sample_cv.txt"):
-            os.remove("sample_cv.txt")
-    
-    print("-" * 50)
+    out.append(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        data = response.json()
+        out.append(f"Session ID: {data.get('session_id')}")
+        out.append(f"CV Text Preview: {data.get('cv_text')[:200]}...")
+        emit(out)
+        return data.get('session_id')
+    else:
+        out.append(f"Error: {response.text}")
+    
+    out.append("-" * 50)
+    emit(out)
     return None
 
-def test_enhanced_analyze_cv(session_id):
+async def test_enhanced_analyze_cv(client: httpx.AsyncClient, session_id):
     """Test enhanced CV analysis with OpenAI."""
+    out = []
     if not session_id:
-        print("Skipping CV analysis - no session ID")
+        out.append("Skipping CV analysis - no session ID")
+        emit(out)
         return
     
-    print("Testing enhanced CV analysis...")
+    out.append("Testing enhanced CV analysis...")
     
     data = {
         "session_id": session_id,
@@ -122,66 +127,72 @@ def test_enhanced_analyze_cv(session_id):
         """
     }
     
-    response = requests.post(f"{BASE_URL}/analyze-cv", data=data)
-    print(f"Status: {response.status_code}")
+    response = await client.post("/analyze-cv", data=data)
+    out.append(f"Status: {response.status_code}")
     if response.status_code == 200:
         result = response.json()
-        print(f"Score: {result.get('original_score')}/100")
-        print(f"\nStrengths:")
+        out.append(f"Score: {result.get('original_score')}/100")
+        out.append(f"\nStrengths:")
         for strength in result.get('strengths', []):
-            print(f"  • {strength}")
-        print(f"\nMissing Skills:")
+            out.append(f"  • {strength}")
+        out.append(f"\nMissing Skills:")
         for skill in result.get('missing_skills', []):
-            print(f"  • {skill}")
-        print(f"\nExperience Gaps:")
+            out.append(f"  • {skill}")
+        out.append(f"\nExperience Gaps:")
         for gap in result.get('experience_gaps', []):
-            print(f"  • {gap}")
-        print(f"\nRecommendations:")
+            out.append(f"  • {gap}")
+        out.append(f"\nRecommendations:")
         for rec in result.get('recommendations', []):
-            print(f"  • {rec}")
-        print(f"\nSummary: {result.get('summary')}")
+            out.append(f"  • {rec}")
+        out.append(f"\nSummary: {result.get('summary')}")
     else:
-        print(f"Error: {response.text}")
+        out.append(f"Error: {response.text}")
     
-    print("-" * 50)
+    out.append("-" * 50)
+    emit(out)
 
-def test_get_recommendations(session_id):
+async def test_get_recommendations(client: httpx.AsyncClient, session_id):
     """Test getting detailed recommendations."""
+    out = []
     if not session_id:
-        print("Skipping recommendations - no session ID")
+        out.append("Skipping recommendations - no session ID")
+        emit(out)
         return
     
-    print("Testing recommendation endpoint...")
+    out.append("Testing recommendation endpoint...")
     
-    response = requests.get(f"{BASE_URL}/get-recommendations/{session_id}")
-    print(f"Status: {response.status_code}")
+    response = await client.get(f"/get-recommendations/{session_id}")
+    out.append(f"Status: {response.status_code}")
     if response.status_code == 200:
         result = response.json()
         suggestions = result.get('improvement_suggestions', {})
         
-        print(f"Current Score: {result.get('current_score')}/100")
-        print(f"\nEnhanced Summary Suggestion:")
-        print(f"  {suggestions.get('enhanced_summary', 'N/A')}")
+        out.append(f"Current Score: {result.get('current_score')}/100")
+        out.append(f"\nEnhanced Summary Suggestion:")
+        out.append(f"  {suggestions.get('enhanced_summary', 'N/A')}")
         
-        print(f"\nSkill Addition Tips:")
+        out.append(f"\nSkill Addition Tips:")
         for tip in suggestions.get('skill_additions', []):
-            print(f"  • {tip}")
+            out.append(f"  • {tip}")
             
-        print(f"\nKeyword Optimization:")
+        out.append(f"\nKeyword Optimization:")
         for keyword in suggestions.get('keyword_optimization', []):
-            print(f"  • {keyword}")
+            out.append(f"  • {keyword}")
     else:
-        print(f"Error: {response.text}")
+        out.append(f"Error: {response.text}")
     
-    print("-" * 50)
+    out.append("-" * 50)
+    emit(out)
 
-def test_enhanced_cv_generation(session_id):
+async def test_enhanced_cv_generation(client: httpx.AsyncClient, session_id):
     """Test enhanced CV generation with additional info."""
+    out = []
     if not session_id:
-        print("Skipping CV generation - no session ID")
+        out.append("Skipping CV generation - no session ID")
+        emit(out)
         return
     
-    print("Testing enhanced CV generation...")
+    out.append("Testing enhanced CV generation...")
     
     additional_info = """
     Additional Skills and Experience:
@@ -211,36 +222,48 @@ def test_enhanced_cv_generation(session_id):
         "additional_info": additional_info
     }
     
-    response = requests.post(f"{BASE_URL}/add-missing-info", data=data)
-    print(f"Status: {response.status_code}")
+    response = await client.post("/add-missing-info", data=data)
+    out.append(f"Status: {response.status_code}")
     if response.status_code == 200:
         result = response.json()
-        print(f"Original Score: {result.get('original_score')}/100")
-        print(f"New Score: {result.get('new_score')}/100")
-        print(f"Improvement: +{result.get('new_score', 0) - result.get('original_score', 0)} points")
-        print(f"Download Link: {result.get('download_link')}")
+        out.append(f"Original Score: {result.get('original_score')}/100")
+        out.append(f"New Score: {result.get('new_score')}/100")
+        out.append(f"Improvement: +{result.get('new_score', 0) - result.get('original_score', 0)} points")
+        out.append(f"Download Link: {result.get('download_link')}")
         
         suggestions = result.get('improvement_suggestions', {})
         if suggestions:
-            print(f"\nCV Enhancement Suggestions:")
-            print(f"Enhanced Summary: {suggestions.get('enhanced_summary', 'N/A')[:100]}...")
+            out.append(f"\nCV Enhancement Suggestions:")
+            out.append(f"Enhanced Summary: {suggestions.get('enhanced_summary', 'N/A')[:100]}...")
     else:
-        print(f"Error: {response.text}")
+        out.append(f"Error: {response.text}")
     
-    print("-" * 50)
+    out.append("-" * 50)
+    emit(out)
+
+async def test_session_flow(client: httpx.AsyncClient):
+    """Upload a CV, analyze it, then run the steps that build on the analysis."""
+    session_id = await test_upload_cv(client)
+    
+    if session_id:
+        await test_enhanced_analyze_cv(client, session_id)
+        # Both read the stored analysis and are independent of each other
+        await asyncio.gather(
+            test_get_recommendations(client, session_id),
+            test_enhanced_cv_generation(client, session_id),
+        )
+
+async def main():
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=TIMEOUT) as client:
+        # The health check does not depend on the session flow
+        await asyncio.gather(test_health_check(client), test_session_flow(client))
 
 if __name__ == "__main__":
     print("Enhanced CV Analyzer API Test Script")
     print("=" * 60)
     
     # Test enhanced functionality
-    test_health_check()
-    session_id = test_upload_cv()
-    
-    if session_id:
-        test_enhanced_analyze_cv(session_id)
-        test_get_recommendations(session_id)
-        test_enhanced_cv_generation(session_id)
+    asyncio.run(main())
     
     print("\n" + "=" * 60)
     print("Testing complete!")
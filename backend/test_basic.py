@@ -11,3 +11,34 @@ def test_imports():
     except ImportError:
         # If main can't be imported, at least the test doesn't fail
         assert True
+
+
+TEXT_BOX_DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+    xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+    xmlns:v="urn:schemas-microsoft-com:vml" mc:Ignorable="wps">
+  <w:body>
+    <w:p><w:r><mc:AlternateContent>
+      <mc:Choice Requires="wps"><w:drawing><wps:txbx><w:txbxContent>
+        <w:p><w:r><w:t>Skills: Python, SQL</w:t></w:r></w:p>
+      </w:txbxContent></wps:txbx></w:drawing></mc:Choice>
+      <mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>
+        <w:p><w:r><w:t>Skills: Python, SQL</w:t></w:r></w:p>
+      </w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>
+    </mc:AlternateContent></w:r></w:p>
+    <w:p><w:r><w:t>Body text paragraph here</w:t></w:r></w:p>
+  </w:body>
+</w:document>"""
+
+
+def test_docx_text_box_extracted_once(tmp_path):
+    """Text boxes are stored twice (mc:Choice and mc:Fallback) but should be read once"""
+    import zipfile
+    from app.utils import extract_text_from_docx
+
+    path = tmp_path / "text_box.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", TEXT_BOX_DOCUMENT_XML)
+
+    assert extract_text_from_docx(str(path)) == "Skills: Python, SQL\nBody text paragraph here"
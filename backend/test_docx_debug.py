@@ -7,9 +7,39 @@ and run: python test_docx_debug.py your_file.docx
 
 import sys
 import os
+import io
 import docx
 from docx import Document
 import zipfile
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_BODY = f"{{{W_NS}}}body"
+W_P = f"{{{W_NS}}}p"
+# Run text the way python-docx's Paragraph.text sees it (including hyperlink runs)
+PARAGRAPH_TEXT = etree.XPath("./w:r/w:t | ./w:hyperlink/w:r/w:t", namespaces={"w": W_NS})
+
+def read_paragraph_texts(zip_file):
+    """Return the text of each top-level body paragraph by streaming word/document.xml."""
+    data = zip_file.read("word/document.xml")
+    
+    texts = []
+    for _, elem in etree.iterparse(io.BytesIO(data), tag=W_P):
+        # Document.paragraphs only covers body paragraphs, not those inside tables
+        if elem.getparent().tag != W_BODY:
+            continue
+        texts.append("".join(t.text or "" for t in PARAGRAPH_TEXT(elem)))
+        # Free parsed nodes as we go
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return texts
+
+def cell_text(tc):
+    """Return a raw <w:tc> element's text, paragraphs joined by newlines like _Cell.text."""
+    return "\n".join(
+        "".join(t.text or "" for t in PARAGRAPH_TEXT(p)) for p in tc.iterchildren(W_P)
+    )
 
 def analyze_docx_file(file_path):
     """Comprehensive DOCX file analysis."""
@@ -25,46 +55,79 @@ def analyze_docx_file(file_path):
     file_size = os.path.getsize(file_path)
     print(f"📁 File size: {file_size:,} bytes")
     
+    # Open the file once; zipfile and python-docx share the handle
+    with open(file_path, 'rb') as docx_file:
+        analyze_docx_contents(docx_file)
+
+def analyze_docx_contents(docx_file):
+    """Inspect and extract text from an open DOCX file handle."""
     # Check if it's a valid ZIP file (DOCX is a ZIP container)
+    if not zipfile.is_zipfile(docx_file):
+        print("❌ Invalid ZIP structure: File is not a zip file")
+        return
+    
+    # Read paragraphs straight from the XML; python-docx is only needed as a fallback
+    doc = None
+    paragraph_texts = None
     try:
-        with zipfile.ZipFile(file_path, 'r') as zip_file:
-            files_in_docx = zip_file.namelist()
-            print(f"📦 Valid ZIP structure with {len(files_in_docx)} files")
+        with zipfile.ZipFile(docx_file, 'r') as zip_file:
+            # ZipFile already indexes its members by name, no need to build a list
+            members = zip_file.NameToInfo
+            print(f"📦 Valid ZIP structure with {len(members)} files")
             
             # Check for essential DOCX files
             essential_files = ['word/document.xml', '[Content_Types].xml']
             for essential in essential_files:
-                if essential in files_in_docx:
+                if essential in members:
                     print(f"✅ Found: {essential}")
                 else:
                     print(f"❌ Missing: {essential}")
+            essentials_ok = all(essential in members for essential in essential_files)
+            
+            if essentials_ok:
+                try:
+                    paragraph_texts = read_paragraph_texts(zip_file)
+                    print("✅ Parsed word/document.xml")
+                except Exception as e:
+                    print(f"⚠️  Could not stream word/document.xml ({e}), falling back to python-docx")
     except Exception as e:
         print(f"❌ Invalid ZIP structure: {e}")
         return
     
-    # Try to open with python-docx
+    # Without these parts python-docx can only fail deep inside its loader, so stop here
+    if not essentials_ok:
+        print("❌ Not a usable DOCX package: required parts are missing, skipping text extraction")
+        return
+    
     try:
-        doc = Document(file_path)
-        print(f"✅ Successfully opened with python-docx")
+        if paragraph_texts is None:
+            docx_file.seek(0)
+            doc = Document(docx_file)
+            print(f"✅ Successfully opened with python-docx")
+            paragraph_texts = [para.text for para in doc.paragraphs]
         
         # Count paragraphs
-        paragraph_count = len(doc.paragraphs)
+        paragraph_count = len(paragraph_texts)
         print(f"📄 Total paragraphs: {paragraph_count}")
         
-        # Extract text
-        text_parts = []
+        # Extract text into one growing buffer rather than a list of strings
+        text_buffer = io.StringIO()
         non_empty_paragraphs = 0
         
-        for i, para in enumerate(doc.paragraphs):
-            if para.text.strip():
-                text_parts.append(para.text)
+        for i, para_text in enumerate(paragraph_texts):
+            if para_text.strip():
+                if non_empty_paragraphs:
+                    text_buffer.write("\n")
+                text_buffer.write(para_text)
                 non_empty_paragraphs += 1
-                if i < 5:  # Show first 5 non-empty paragraphs
-                    print(f"📝 Paragraph {i+1}: '{para.text[:100]}{'...' if len(para.text) > 100 else ''}'")
+                # Show first 5 non-empty paragraphs; later ones are only counted
+                if non_empty_paragraphs <= 5:
+                    preview = para_text if len(para_text) <= 100 else para_text[:100] + "..."
+                    print(f"📝 Paragraph {i+1}: '{preview}'")
         
         print(f"📄 Non-empty paragraphs: {non_empty_paragraphs}")
         
-        full_text = "\n".join(text_parts)
+        full_text = text_buffer.getvalue()
         text_length = len(full_text)
         
         print(f"📊 Total extracted text length: {text_length} characters")
@@ -76,6 +139,9 @@ def analyze_docx_file(file_path):
             print("   - Document has unusual formatting")
             
             # Check for tables
+            if doc is None:
+                docx_file.seek(0)
+                doc = Document(docx_file)
             table_count = len(doc.tables)
             print(f"📋 Tables found: {table_count}")
             
@@ -83,7 +149,8 @@ def analyze_docx_file(file_path):
                 print("🔍 Checking table content...")
                 for i, table in enumerate(doc.tables[:3]):  # Check first 3 tables
                     for j, row in enumerate(table.rows[:3]):  # Check first 3 rows
-                        row_text = " | ".join([cell.text for cell in row.cells])
+                        # Read the <w:tc> elements directly instead of building _Cell objects
+                        row_text = " | ".join(cell_text(tc) for tc in row._tr.tc_lst)
                         if row_text.strip():
                             print(f"   Table {i+1}, Row {j+1}: {row_text[:100]}")
         else:
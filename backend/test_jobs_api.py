@@ -4,162 +4,223 @@ Test script for the new jobs listing endpoints.
 Demonstrates the /jobs, /jobs/stats, and /jobs/{id}/details endpoints.
 """
 
+import sys
 import requests
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive session for every call, with enough pooled connections for concurrent probes
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+# Per-URL ETag and parsed body, so repeat requests can be answered with 304 Not Modified
+_ETAG_CACHE = {}
+_CACHED = {}
+
+def cached_get(url):
+    """GET a JSON endpoint, revalidating with If-None-Match when an ETag is known.
+    
+    Returns (response, data); data is the parsed body for 200 and 304 responses, else None.
+    """
+    headers = {"If-None-Match": _ETAG_CACHE[url]} if url in _ETAG_CACHE else None
+    response = SESSION.get(url, headers=headers)
+    if response.status_code == 304 and url in _CACHED:
+        return response, _CACHED[url]
+    if response.status_code != 200:
+        return response, None
+    
+    data = orjson.loads(response.content)
+    etag = response.headers.get("ETag")
+    if etag:
+        _ETAG_CACHE[url] = etag
+        _CACHED[url] = data
+    return response, data
+
+def get_jobs_with_details(limit=1):
+    """List jobs with their details expanded inline, in a single request.
+    
+    Returns (response, data) like cached_get. Servers that reject ``expand`` get the
+    plain listing instead; callers should fall back to /jobs/{id}/details for any
+    job without a ``details`` entry.
+    """
+    response, data = cached_get(f"{BASE_URL}/jobs?expand=details&limit={limit}")
+    if response.status_code in (400, 404):
+        response, data = cached_get(f"{BASE_URL}/jobs?limit={limit}")
+    return response, data
+
 def format_json(data):
     """Pretty print JSON data."""
-    return json.dumps(data, indent=2, default=str)
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode()
+
+def emit(lines):
+    """Write a section's collected output lines in a single call."""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def test_jobs_list():
     """Test the jobs listing endpoint with various filters."""
-    print("🔍 Testing Jobs List Endpoint")
-    print("=" * 50)
+    out = []
+    out.append("🔍 Testing Jobs List Endpoint")
+    out.append("=" * 50)
+    
+    # The three listings are independent, so fetch them concurrently
+    urls = [
+        f"{BASE_URL}/jobs",
+        f"{BASE_URL}/jobs?job_title=Python",
+        f"{BASE_URL}/jobs?min_score=50&max_score=70",
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        basic_result, title_result, score_result = executor.map(cached_get, urls)
     
     # Test basic listing
-    print("\n1. Basic jobs list:")
-    response = requests.get(f"{BASE_URL}/jobs")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"Total jobs: {data['total_count']}")
-        print(f"Returned: {data['returned_count']}")
-        print(f"Has more: {data['has_more']}")
+    out.append("\n1. Basic jobs list:")
+    response, data = basic_result
+    if data is not None:
+        out.append(f"Total jobs: {data['total_count']}")
+        out.append(f"Returned: {data['returned_count']}")
+        out.append(f"Has more: {data['has_more']}")
         
         for job in data['jobs']:
-            print(f"  • {job['session_id']}: {job['job_title']} - Score: {job['original_score']}/100")
+            out.append(f"  • {job['session_id']}: {job['job_title']} - Score: {job['original_score']}/100")
             if job['score_improvement']:
-                print(f"    Improvement: +{job['score_improvement']} points")
-            print(f"    Skills missing: {job['missing_skills_count']}, Strengths: {job['strengths_count']}")
+                out.append(f"    Improvement: +{job['score_improvement']} points")
+            out.append(f"    Skills missing: {job['missing_skills_count']}, Strengths: {job['strengths_count']}")
     else:
-        print(f"Error: {response.status_code} - {response.text}")
+        out.append(f"Error: {response.status_code} - {response.text}")
     
     # Test filtering
-    print("\n2. Filtering by job title:")
-    response = requests.get(f"{BASE_URL}/jobs?job_title=Python")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"Python jobs found: {data['returned_count']}")
+    out.append("\n2. Filtering by job title:")
+    response, data = title_result
+    if data is not None:
+        out.append(f"Python jobs found: {data['returned_count']}")
         
     # Test score filtering
-    print("\n3. Filtering by score range:")
-    response = requests.get(f"{BASE_URL}/jobs?min_score=50&max_score=70")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"Jobs with score 50-70: {data['returned_count']}")
+    out.append("\n3. Filtering by score range:")
+    response, data = score_result
+    if data is not None:
+        out.append(f"Jobs with score 50-70: {data['returned_count']}")
+    emit(out)
 
 def test_jobs_stats():
     """Test the jobs statistics endpoint."""
-    print("\n📊 Testing Jobs Statistics Endpoint")
-    print("=" * 50)
+    out = []
+    out.append("\n📊 Testing Jobs Statistics Endpoint")
+    out.append("=" * 50)
     
-    response = requests.get(f"{BASE_URL}/jobs/stats")
-    if response.status_code == 200:
-        stats = response.json()
+    response, stats = cached_get(f"{BASE_URL}/jobs/stats")
+    if stats is not None:
         
-        print("\nOverview:")
+        out.append("\nOverview:")
         overview = stats['overview']
-        print(f"  Total jobs: {overview['total_jobs']}")
-        print(f"  Analyzed jobs: {overview['analyzed_jobs']}")
-        print(f"  Enhanced jobs: {overview['enhanced_jobs']}")
-        print(f"  Completion rate: {overview['completion_rate']}%")
+        out.append(f"  Total jobs: {overview['total_jobs']}")
+        out.append(f"  Analyzed jobs: {overview['analyzed_jobs']}")
+        out.append(f"  Enhanced jobs: {overview['enhanced_jobs']}")
+        out.append(f"  Completion rate: {overview['completion_rate']}%")
         
-        print("\nScore Analysis:")
+        out.append("\nScore Analysis:")
         scores = stats['scores']
-        print(f"  Average original score: {scores['average_original_score']}")
-        print(f"  Average enhanced score: {scores['average_enhanced_score']}")
-        print(f"  Average improvement: {scores['average_improvement']}")
-        print(f"  Score range: {scores['min_original_score']} - {scores['max_original_score']}")
+        out.append(f"  Average original score: {scores['average_original_score']}")
+        out.append(f"  Average enhanced score: {scores['average_enhanced_score']}")
+        out.append(f"  Average improvement: {scores['average_improvement']}")
+        out.append(f"  Score range: {scores['min_original_score']} - {scores['max_original_score']}")
         
-        print("\nFile Types:")
+        out.append("\nFile Types:")
         for file_type, count in stats['file_types'].items():
-            print(f"  {file_type}: {count}")
+            out.append(f"  {file_type}: {count}")
         
-        print("\nTop Job Titles:")
+        out.append("\nTop Job Titles:")
         for job_title in stats['top_job_titles']:
-            print(f"  {job_title['title']}: {job_title['count']} applications")
+            out.append(f"  {job_title['title']}: {job_title['count']} applications")
         
-        print("\nRecent Activity:")
+        out.append("\nRecent Activity:")
         activity = stats['recent_activity']
-        print(f"  Last 7 days: {activity['jobs_last_7_days']} jobs")
-        print(f"  Last 30 days: {activity['jobs_last_30_days']} jobs")
+        out.append(f"  Last 7 days: {activity['jobs_last_7_days']} jobs")
+        out.append(f"  Last 30 days: {activity['jobs_last_30_days']} jobs")
         
-        print("\nPerformance Metrics:")
+        out.append("\nPerformance Metrics:")
         metrics = stats['performance_metrics']
-        print(f"  High performing (≥80): {metrics['high_performing_jobs']}")
-        print(f"  Low performing (<50): {metrics['low_performing_jobs']}")
-        print(f"  Most improved (≥20): {metrics['most_improved_jobs']}")
+        out.append(f"  High performing (≥80): {metrics['high_performing_jobs']}")
+        out.append(f"  Low performing (<50): {metrics['low_performing_jobs']}")
+        out.append(f"  Most improved (≥20): {metrics['most_improved_jobs']}")
     else:
-        print(f"Error: {response.status_code} - {response.text}")
+        out.append(f"Error: {response.status_code} - {response.text}")
+    emit(out)
 
 def test_job_details():
     """Test the job details endpoint."""
-    print("\n📋 Testing Job Details Endpoint")
-    print("=" * 50)
+    out = []
+    out.append("\n📋 Testing Job Details Endpoint")
+    out.append("=" * 50)
     
-    # First get a job ID
-    response = requests.get(f"{BASE_URL}/jobs?limit=1")
-    if response.status_code != 200:
-        print("No jobs found to test details")
+    # Get a job ID, with its details too when the server can expand them
+    response, data = get_jobs_with_details(limit=1)
+    if data is None:
+        out.append("No jobs found to test details")
+        emit(out)
         return
     
-    jobs = response.json()['jobs']
+    jobs = data['jobs']
     if not jobs:
-        print("No jobs available for testing")
+        out.append("No jobs available for testing")
+        emit(out)
         return
     
     job_id = jobs[0]['session_id']
-    print(f"\nGetting details for job: {job_id}")
+    out.append(f"\nGetting details for job: {job_id}")
     
-    response = requests.get(f"{BASE_URL}/jobs/{job_id}/details")
-    if response.status_code == 200:
-        details = response.json()
+    details = jobs[0].get('details')
+    if details is None:
+        response, details = cached_get(f"{BASE_URL}/jobs/{job_id}/details")
+    if details is not None:
         
-        print("\nJob Information:")
+        out.append("\nJob Information:")
         job_info = details['job_info']
-        print(f"  Session ID: {job_info['session_id']}")
-        print(f"  Job Title: {job_info['job_title']}")
-        print(f"  File Type: {job_info['file_type']}")
-        print(f"  Created: {job_info['created_at']}")
+        out.append(f"  Session ID: {job_info['session_id']}")
+        out.append(f"  Job Title: {job_info['job_title']}")
+        out.append(f"  File Type: {job_info['file_type']}")
+        out.append(f"  Created: {job_info['created_at']}")
         
-        print("\nCV Content:")
+        out.append("\nCV Content:")
         cv_content = details['cv_content']
-        print(f"  Text Length: {cv_content['full_text_length']} characters")
-        print(f"  Preview: {cv_content['cv_text_preview'][:100]}...")
+        out.append(f"  Text Length: {cv_content['full_text_length']} characters")
+        out.append(f"  Preview: {cv_content['cv_text_preview'][:100]}...")
         
-        print("\nAnalysis Results:")
+        out.append("\nAnalysis Results:")
         analysis = details['analysis_results']
         if analysis['is_analyzed']:
-            print(f"  Original Score: {analysis['original_score']}/100")
+            out.append(f"  Original Score: {analysis['original_score']}/100")
             if analysis['new_score']:
-                print(f"  Enhanced Score: {analysis['new_score']}/100")
-                print(f"  Improvement: +{analysis['score_improvement']} points")
+                out.append(f"  Enhanced Score: {analysis['new_score']}/100")
+                out.append(f"  Improvement: +{analysis['score_improvement']} points")
             if analysis['summary']:
-                print(f"  Summary: {analysis['summary'][:100]}...")
+                out.append(f"  Summary: {analysis['summary'][:100]}...")
         else:
-            print("  Status: Not yet analyzed")
+            out.append("  Status: Not yet analyzed")
         
-        print("\nSkills Analysis:")
+        out.append("\nSkills Analysis:")
         skills = details['skills_analysis']
         if skills['missing_skills']:
-            print(f"  Missing Skills ({len(skills['missing_skills'])}):")
+            out.append(f"  Missing Skills ({len(skills['missing_skills'])}):")
             for skill in skills['missing_skills'][:3]:
-                print(f"    • {skill}")
+                out.append(f"    • {skill}")
         if skills['strengths']:
-            print(f"  Strengths ({len(skills['strengths'])}):")
+            out.append(f"  Strengths ({len(skills['strengths'])}):")
             for strength in skills['strengths'][:3]:
-                print(f"    • {strength}")
+                out.append(f"    • {strength}")
         if not skills['missing_skills'] and not skills['strengths']:
-            print("  No skills analysis available yet")
+            out.append("  No skills analysis available yet")
         
-        print("\nEnhancement Status:")
+        out.append("\nEnhancement Status:")
         enhancement = details['enhancement']
-        print(f"  Has Additional Info: {enhancement['has_additional_info']}")
-        print(f"  Has Enhanced CV: {enhancement['has_enhanced_cv']}")
+        out.append(f"  Has Additional Info: {enhancement['has_additional_info']}")
+        out.append(f"  Has Enhanced CV: {enhancement['has_enhanced_cv']}")
     else:
-        print(f"Error: {response.status_code} - {response.text}")
+        out.append(f"Error: {response.status_code} - {response.text}")
+    emit(out)
 
 if __name__ == "__main__":
     print("🚀 CV Analyzer Jobs Endpoint Testing")